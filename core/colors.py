@@ -1,7 +1,14 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 from collections import defaultdict
+import csv
 
-manual = map(lambda x: x.split("\t")[2:-1], open("listButtonCombos.csv").read().split("\r\n")[1:-1])
+def read_rows(path):
+    with open(path, newline="") as f:
+        rows = csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE)
+        next(rows)
+        return [row[2:-1] for row in rows]
+
+manual = read_rows("listButtonCombos.csv")
 
 colors = {}
 for m in manual:
@@ -9,7 +16,7 @@ for m in manual:
         colors[c] = True
 
 
-custom = map(lambda x: x.split("\t")[2:-1], open("listUsedWNames.csv").read().split("\r\n")[1:-1])
+custom = read_rows("listUsedWNames.csv")
 
 for m in custom:
     for c in m[3:]:
@@ -20,7 +27,7 @@ all_c.sort()
 keys = dict([(v,k) for (k,v) in enumerate(all_c)])
 
 for c in all_c:
-    print "[0x{}, 0x{}, 0x{}],".format(c[1:3], c[3:5], c[5:7])
+    print("[0x{}, 0x{}, 0x{}],".format(c[1:3], c[3:5], c[5:7]))
     
 print(keys)
 
@@ -35,8 +42,8 @@ for m in custom:
     for c in range(3, len(m)):
         m[c] = keys[m[c]]
 
-    matches["CustomPalette {{bg:{}, obj0: {}, obj1: {} }}".format(m[3:7], m[7:11], m[11:15])].append("({}, {})".format(m[0], m[1] if m[1] else "_"))
+    matches[(tuple(m[3:7]), tuple(m[7:11]), tuple(m[11:15]))].append("({}, {})".format(m[0], m[1] if m[1] else "_"))
 
 
-for m,v  in matches.iteritems():
-    print "{} => {},".format(("|".join(v)), m)
+for (bg, obj0, obj1), v in matches.items():
+    print(f"{'|'.join(v)} => CustomPalette {{bg:{list(bg)}, obj0: {list(obj0)}, obj1: {list(obj1)} }},")
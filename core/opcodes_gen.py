@@ -0,0 +1,181 @@
+from collections import namedtuple
+import hashlib
+import html
+import os
+import pickle
+import re
+import tempfile
+
+Gen = namedtuple("Gen", "op op_name name size cycles cycles_false fmt init elems")
+
+CONDS = ["Z", "NZ", "C", "NC"]
+REG16 = ["AF", "BC", "DE", "HL", "HLP", "HLS", "SP", "PC"]
+REG8 = ["A", "F", "B", "C", "D", "E", "H", "L"]
+
+_INVALID = re.compile("\xa0+")
+_TIMING = re.compile("([0-9]+)\xa0+([0-9]+)(?:/([0-9]+))?")
+_SETBIT = re.compile(r"(SET|BIT|RES) [0-9]+")
+_COND = re.compile(r"(JP|JR|CALL|RET) ({})\b".format("|".join(CONDS)))
+_REG = re.compile(r"\b({})\b".format("|".join(REG16 + REG8)))
+_LIT = re.compile(r"\b[0-9]+H\b")
+_PAREN = re.compile(r"\(([a-z0-9+-]+)\)")
+_STRIP_PAREN = re.compile(r"\(|\)")
+
+_TABLE = re.compile(r"<table\b.*?</table>", re.S | re.I)
+_ROW = re.compile(r"<tr\b.*?</tr>", re.S | re.I)
+_CELL = re.compile(r"<td\b[^>]*>(.*?)</td>", re.S | re.I)
+_BR = re.compile(r"<br\s*/?>", re.I)
+
+_BRANCH_SET = frozenset(["JP", "JR", "CALL", "RET"])
+_COND_SET = frozenset(CONDS)
+_R16_SET = frozenset(REG16)
+_R8_SET = frozenset(REG8)
+_IMM = {
+    "d8" : "u8",
+    "d16" : "u16",
+    "a8" : "u8",
+    "a16" : "u16",
+    "r8" : "i8"
+}
+
+_shape_cache = {}
+
+def _reg_kind(m):
+    return "r16" if m.group(1) in _R16_SET else "r8"
+
+def _classify(branch, items):
+    # Operand typing only depends on the tokens, so opcodes sharing a shape reuse it
+    key = (branch, items)
+    if key in _shape_cache:
+        return _shape_cache[key]
+
+    init = []
+    elems = []
+    for i in items:
+        i = _STRIP_PAREN.sub("", i)
+        if branch and i in _COND_SET:
+            init.append("Cond::{}".format(i))
+            elems.append("Cond")
+        elif i in _R16_SET:
+            init.append("Reg16::{}".format(i))
+            elems.append("Reg16")
+        elif i[:1] in _R8_SET:
+            # Leading letter only, so "PREFIX CB" still yields Reg8::CB
+            init.append("Reg8::{}".format(i))
+            elems.append("Reg8")
+        elif i.endswith("H") and i[:-1].isdigit():
+            init.append("0x{}".format(i[:-1]))
+            elems.append("u8")
+        elif i.isdigit():
+            init.append(str(i))
+            elems.append("u8")
+        elif i in _IMM:
+            conv = _IMM[i]
+            init.append("read_u{}(bytes)?{}".format(i[1:], "" if conv[0] == "u" else
+                                                    " as {}".format(conv)))
+            elems.append(conv)
+        else:
+            print(i)
+            assert(False)
+
+    _shape_cache[key] = (tuple(init), tuple(elems))
+    return _shape_cache[key]
+
+def read_cell(opcode, parts):
+    if _INVALID.match(parts[0]):
+        return Gen(opcode, "INVALID", "INVALID", 1, 1, None, ["opcode"], (), ())
+
+    mnemonic, l2, l3 = parts
+    m = _TIMING.match(l2)
+    bytes, cycles, cycles_false = (int(m.group(1)), int(m.group(2)), int(m.group(3)) if m.group(3) else None)
+    if cycles_false:
+        (cycles, cycles_false) = (cycles_false, cycles)
+
+    (z, n, h, c) = l3.split(" ")
+    generic = mnemonic.replace("HL+", "HLP").replace("+", " ").replace("HL-", "HLS")
+    clean_mnem = generic
+    generic = _SETBIT.sub(r"\1 l8", generic)
+    generic = _COND.sub(r"\1 COND", generic)
+    generic = _REG.sub(_reg_kind, generic)
+
+    generic = _LIT.sub("LIT", generic)
+
+    items = generic.replace(",", " ").split()
+    name = items[0]
+    new_items = []
+    args = []
+    fmt = []
+    for i in items[1:]:
+        match = _PAREN.match(i)
+        if match:
+            fmt.append("({:?})")
+            new_items.append("i" + match.group(1))
+        else:
+            fmt.append("{:?}")
+            new_items.append(i)
+
+    items = clean_mnem.replace(",", " ").split()[1:]
+    (init, elems) = _classify(name in _BRANCH_SET, tuple(items))
+
+    return Gen(
+        opcode,
+        name,
+        "_".join([name] + new_items),
+        bytes,
+        cycles,
+        cycles_false,
+        name + (" " if len(fmt) > 0 else "") + ",".join(fmt),
+        init,
+        elems
+    )
+
+
+def cell_contents(cell):
+    # Cells are "mnemonic<br>size cycles<br>flags", the lines are the text around the <br>s
+    return [html.unescape(part) for part in _BR.split(cell)]
+
+def do_table(gens, table, prefix = 0):
+    for (r_id, r) in enumerate(_ROW.findall(table)[1:]):
+        for (d_id, d) in enumerate(_CELL.findall(r)[1:]):
+            opcode = (prefix << 8) | (r_id << 4) | d_id
+            gens[opcode] = read_cell(opcode, cell_contents(d))
+
+def parse_opcodes(html_path):
+    with open(html_path, "rb") as f:
+        raw = f.read().decode("utf-8")
+
+    tables = _TABLE.findall(raw)
+    base = tables[0]
+    extend = tables[1]
+
+    gens = {}
+    do_table(gens, base)
+    do_table(gens, extend, prefix=0xCB)
+    return gens
+
+def load_opcodes(html_path):
+    # The opcode table never changes, so reuse the parse keyed on the table and on
+    # this module so edits to the parser don't pick up stale results
+    h = hashlib.sha1()
+    for path in (html_path, __file__):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    key = h.hexdigest()
+    cache_dir = os.path.dirname(html_path)
+    cache = os.path.join(cache_dir, ".opcodes.pkl")
+    try:
+        with open(cache, "rb") as f:
+            # The key is its own record so a stale table is never unpickled
+            if pickle.load(f) == key:
+                return pickle.load(f)
+    except Exception:
+        # Anything wrong with the cache just means parsing the table again
+        pass
+
+    gens = parse_opcodes(html_path)
+    # Write beside the cache and swap it in so an interrupted run can't leave a truncated file
+    with tempfile.NamedTemporaryFile("wb", dir=cache_dir or ".", prefix=".opcodes.pkl.", delete=False) as f:
+        pickle.dump(key, f)
+        pickle.dump(gens, f)
+    os.replace(f.name, cache)
+    return gens
@@ -1,154 +1,45 @@
-#!/usr/bin/env python
-from bs4 import BeautifulSoup
-from collections import defaultdict, namedtuple
-from bases import Bases
-import re
+#!/usr/bin/env pypy3
+from opcodes_gen import load_opcodes
+import sys
 
-gens = {}
+TABLES = ["defs", "read", "display", "data"]
 
-Gen = namedtuple("Gen", "op op_name name size cycles cycles_false fmt init elems")
+# Tables to print, e.g. `test.py defs display`; only the opcode data by default
+WANT = set(sys.argv[1:]) or {"data"}
+if not WANT <= set(TABLES):
+    sys.exit(f"usage: {sys.argv[0]} [{'|'.join(TABLES)}]...\nunknown table: {', '.join(sorted(WANT - set(TABLES)))}")
 
-def read_cell(opcode, c):
-    if re.match("\xa0+", c):
-        g = Gen(opcode, "INVALID", "INVALID", 1, 1, None, ["opcode"], [], [])
-    else:
-        mnemonic, l2, l3 = c.split("<br/>")
-        m = re.match("([0-9]+)\xa0+([0-9]+)(?:/([0-9]+))?", l2)
-        bytes, cycles, cycles_false = (int(m.group(1)), int(m.group(2)), int(m.group(3)) if m.group(3) else None)
-        if cycles_false:
-            (cycles, cycles_false) = (cycles_false, cycles)
-
-        (z, n, h, c) = l3.split(" ")
-        generic = mnemonic
-        generic = re.sub("HL\+", "HLP", generic)
-        generic = re.sub("\+", " ", generic)
-        clean_mnem = generic = re.sub("HL\-", "HLS", generic)
-        generic = re.sub(r"(SET|BIT|RES) [0-9]+", r"\1 l8", generic)
-        generic = re.sub(r"(JP|JR|CALL|RET) ({})\b".format("|".join(["Z",  "NZ", "C", "NC"])), r"\1 COND", generic)
-        generic = re.sub(r"\b({})\b".format("|".join(["AF","BC", "DE", "HL", "HLP", "HLS", "SP", "PC"])), "r16", generic)
-        generic = re.sub(r"\b({})\b".format("|".join(["A", "F", "B", "C", "D", "E", "H", "L"])), "r8", generic)
-
-        generic = re.sub(r"\b[0-9]+H\b", "LIT", generic)
-
-        items = re.split("\s+|,", generic)
-        name = items[0]
-        new_items = []
-        args = []
-        fmt = []
-        for i in items[1:]:
-            match = re.match(r"\(([a-z0-9+-]+)\)", i)
-            if match:
-                fmt.append("({:?})")
-                new_items.append("i" + match.group(1))
-            else:
-                fmt.append("{:?}")
-                new_items.append(i)
-
-        items = re.split("\s+|,", clean_mnem)[1:]
-        init = []
-        elems = []
-        for i in items:
-            i = re.sub(r"\(|\)", "", i)
-            if re.match(r"(JP|JR|CALL|RET)", name) and re.match("|".join(["Z",  "NZ", "C", "NC"]), i):
-                init.append("Cond::{}".format(i))
-                elems.append("Cond")
-            elif re.match("|".join(["AF","BC", "DE", "HL", "HLP", "HLS", "SP", "PC"]), i):
-                init.append("Reg16::{}".format(i))
-                elems.append("Reg16")
-            elif re.match("|".join(["A", "F", "B", "C", "D", "E", "H", "L"]), i):
-                init.append("Reg8::{}".format(i))
-                elems.append("Reg8")
-            elif re.match("[0-9]+H", i):
-                init.append("0x{}".format(i[:-1]))
-                elems.append("u8")
-            elif re.match("[0-9]+", i):
-                init.append(str(i))
-                elems.append("u8")
-            elif re.match("[a-z][0-9]+", i):
-                m = re.match("([a-z])([0-9]+)", i)
-                conv = {
-                    "d8" : "u8",
-                    "d16" : "u16",
-                    "a8" : "u8",
-                    "a16" : "u16",
-                    "r8" : "i8"
-                }
-                init.append("read_u{}(bytes)?{}".format(m.group(2), "" if conv[i][0] == "u" else
-                                                        " as {}".format(conv[i])))
-                elems.append(conv[i])
-            else:
-                print i
-                assert(False)
-
-        g = Gen(
-            opcode,
-            name,
-            "_".join([name] + new_items),
-            bytes,
-            cycles,
-            cycles_false,
-            name + (" " if len(fmt) > 0 else "") + ",".join(fmt),
-            init,
-            elems
-        )
-    gens[opcode] = g
-
-
-soup = BeautifulSoup(open("gameboy_opcodes.html").read(), 'html.parser')
-
-tables = soup.find_all('table')
-base = tables[0]
-extend = tables[1]
-
-
-def do_table(table, prefix = 0):
-    for (r_id, r) in enumerate(table.find_all('tr')[1:]):
-        for (d_id, d) in enumerate(r.find_all('td')[1:]):
-            read_cell((prefix << 8) | (r_id << 4) | d_id,  d.decode_contents())
-
-do_table(base)
-do_table(extend, prefix=0xCB)
+gens = load_opcodes("gameboy_opcodes.html")
 
 seen = {}
-display = ""
-defs = ""
-read = ""
-data = ""
-
-import itertools
-for i in itertools.chain(range(0,256), range(0xCB << 8 + 0, (0xCB << 8) + 0x100)):
-    print "0x{:02}".format(i)
-
-    args = ", ".join(["x{}".format(z) for (z, _) in enumerate(gens[i].elems)])
-    read += "0x{:02x} => Instr::{}{},\n".format(
-        i & 0xff,
-        gens[i].name,
-        "({})".format(", ".join(gens[i].init)) if len(args) else "",
-
-    )
-    data += "OpCode {{ mnemonic : \"{}\", size : {}, cycles: {}, cycles_branch: {} }},\n".format(
-        gens[i].op_name,
-        gens[i].size,
-        gens[i].cycles / 4,
-        "None" if gens[i].cycles_false is None else "Some({})".format(gens[i].cycles_false / 4)
-    )
-
-    if gens[i].name in seen:
+display = []
+defs = []
+read = []
+data = []
+
+for i in sorted(gens):
+    g = gens[i]
+    n = len(g.elems)
+    has = n > 0
+    if "read" in WANT:
+        init = f"({', '.join(g.init)})" if has else ""
+        read.append(f"0x{i & 0xff:02x} => Instr::{g.name}{init},\n")
+    if "data" in WANT:
+        branch = "None" if g.cycles_false is None else f"Some({g.cycles_false // 4})"
+        data.append(f"OpCode {{ mnemonic : \"{g.op_name}\", size : {g.size}, cycles: {g.cycles // 4}, cycles_branch: {branch} }},\n")
+
+    if g.name in seen:
         continue
-    seen[gens[i].name] = True
-    display += "Instr::{}{} => write!(f, \"{}\"{}{}),\n".format(
-        gens[i].name,
-        "({})".format(args) if len(args) > 0 else "",
-        gens[i].fmt,
-        ", " if len(args) else "",
-        args,
-    )
-    defs += "{}{},\n".format(
-        gens[i].name,
-        "" if len(gens[i].elems) == 0 else "({})".format(", ".join(gens[i].elems))
-    )
-
-#print defs
-#print read
-#print display
-print data
+    seen[g.name] = True
+    if "display" in WANT:
+        args = ", ".join([f"x{z}" for z in range(n)])
+        fields = f"({args})" if has else ""
+        sep = ", " if has else ""
+        display.append(f"Instr::{g.name}{fields} => write!(f, \"{g.fmt}\"{sep}{args}),\n")
+    if "defs" in WANT:
+        elems = f"({', '.join(g.elems)})" if has else ""
+        defs.append(f"{g.name}{elems},\n")
+
+for (out, lines) in [("defs", defs), ("read", read), ("display", display), ("data", data)]:
+    if out in WANT:
+        print("".join(lines))